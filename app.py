@@ -1,16 +1,38 @@
+import hashlib
+import os
+import shutil
+from concurrent.futures import ThreadPoolExecutor
+
 import streamlit as st
 import pandas as pd
 import numpy as np
-import plotly.express as px
+import pyarrow as pa
+import pyarrow.feather as feather
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
 from datetime import datetime, timedelta
 import warnings
 warnings.filterwarnings('ignore')
 
+import business_metrics
+import data_loader
 from data_loader import EcommerceDataLoader
 from business_metrics import EcommerceMetrics
 
+DATA_PATH = "ecommerce_data"
+CACHE_PATH = ".data_cache"
+CSS_PATH = os.path.join(os.path.dirname(__file__), "static", "dashboard.css")
+
+# Date ranges (and figures built from them) kept in the per-range caches
+MAX_CACHED_RANGES = 64
+
+# Longest series sent to the browser for a single trend line
+MAX_TREND_POINTS = 2000
+
+# Blue gradient for the top 10 categories bar chart, lightest bar first
+BLUE_GRADIENT = tuple(f'rgba(31, 119, 180, {0.3 + 0.7 * (i / 9)})' for i in range(10))
+
 # Configure the page
 st.set_page_config(
     page_title="E-Commerce Business Dashboard",
@@ -19,153 +41,187 @@ st.set_page_config(
     initial_sidebar_state="collapsed"
 )
 
+@st.cache_resource
+def _dashboard_css():
+    """Read the dashboard stylesheet once per server process"""
+    with open(CSS_PATH, encoding='utf-8') as css_file:
+        return css_file.read()
+
 # Custom CSS for professional styling
-st.markdown("""
-<style>
-    .reportview-container {
-        margin-top: -2em;
-    }
-    #MainMenu {visibility: hidden;}
-    .stDeployButton {display:none;}
-    footer {visibility: hidden;}
-    #stDecoration {display:none;}
-    
-    .main-header {
-        font-size: 2.5rem;
-        font-weight: 700;
-        color: #1f77b4;
-        margin-bottom: 1rem;
-    }
-    
-    .kpi-card {
-        background-color: white;
-        padding: 1.5rem;
-        border-radius: 10px;
-        border: 1px solid #e0e0e0;
-        box-shadow: 0 2px 4px rgba(0,0,0,0.1);
-        height: 120px;
-        display: flex;
-        flex-direction: column;
-        justify-content: center;
-    }
-    
-    .kpi-value {
-        font-size: 2rem;
-        font-weight: 700;
-        margin: 0;
-        line-height: 1;
-    }
-    
-    .kpi-label {
-        font-size: 0.9rem;
-        color: #666;
-        margin-top: 0.5rem;
-        margin-bottom: 0.5rem;
-    }
-    
-    .trend-positive {
-        color: #28a745;
-        font-size: 0.8rem;
-        font-weight: 600;
-    }
-    
-    .trend-negative {
-        color: #dc3545;
-        font-size: 0.8rem;
-        font-weight: 600;
-    }
-    
-    .chart-container {
-        background-color: white;
-        padding: 1rem;
-        border-radius: 10px;
-        border: 1px solid #e0e0e0;
-        box-shadow: 0 2px 4px rgba(0,0,0,0.1);
-        height: 400px;
-    }
-    
-    .bottom-card {
-        background-color: white;
-        padding: 1.5rem;
-        border-radius: 10px;
-        border: 1px solid #e0e0e0;
-        box-shadow: 0 2px 4px rgba(0,0,0,0.1);
-        height: 150px;
-        display: flex;
-        flex-direction: column;
-        justify-content: center;
-    }
-    
-    .review-stars {
-        color: #ffc107;
-        font-size: 1.5rem;
-    }
-    
-    .large-number {
-        font-size: 2.5rem;
-        font-weight: 700;
-        margin: 0;
-    }
-    
-    .subtitle {
-        font-size: 0.9rem;
-        color: #666;
-        margin-top: 0.5rem;
-    }
-</style>
-""", unsafe_allow_html=True)
+st.markdown(f"<style>{_dashboard_css()}</style>", unsafe_allow_html=True)
 
 # Initialize session state
 if 'data_loaded' not in st.session_state:
     st.session_state.data_loaded = False
 
-@st.cache_data
+# Metrics calculator shared by the cached metric functions
+metrics = EcommerceMetrics()
+
+def _feather_cache_path():
+    """Return the cache directory for the current source files, loader and metrics code"""
+    source_files = [
+        os.path.join(DATA_PATH, filename) for filename in sorted(os.listdir(DATA_PATH))
+    ]
+    source_files += [__file__, data_loader.__file__, business_metrics.__file__]
+    
+    digest = hashlib.sha1()
+    for file_path in source_files:
+        digest.update(f"{os.path.basename(file_path)}:{os.path.getmtime(file_path)}".encode())
+    
+    return os.path.join(CACHE_PATH, digest.hexdigest()[:16])
+
+def _read_feather_cache(cache_path):
+    """Read every cached dataset, memory-mapping the Feather files"""
+    data = {}
+    for filename in sorted(os.listdir(cache_path)):
+        key = os.path.splitext(filename)[0]
+        table = feather.read_table(os.path.join(cache_path, filename), memory_map=True)
+        data[key] = table.to_pandas()
+    return data
+
+def _write_feather_cache(data, cache_path):
+    """Write datasets to a fresh cache directory, replacing any stale ones"""
+    shutil.rmtree(CACHE_PATH, ignore_errors=True)
+    tmp_path = f"{cache_path}.tmp"
+    os.makedirs(tmp_path)
+    
+    for key, df in data.items():
+        feather.write_feather(
+            pa.Table.from_pandas(df),
+            os.path.join(tmp_path, f"{key}.feather"),
+            compression='zstd'
+        )
+    
+    # Publish the directory only after every file is complete
+    os.rename(tmp_path, cache_path)
+
+def _build_datasets():
+    """Build the dashboard datasets from the raw CSV files"""
+    loader = EcommerceDataLoader(DATA_PATH)
+    datasets = loader.load_all_datasets()
+    
+    # Create enhanced datasets
+    sales_2023 = loader.create_sales_dataset(target_year=2023, order_status='delivered')
+    sales_2022 = loader.create_sales_dataset(target_year=2022, order_status='delivered')
+    
+    sales_with_delivery = loader.add_delivery_metrics(sales_2023)
+    sales_with_reviews = loader.get_review_data(sales_2023)
+    sales_with_categories = loader.get_product_categories_data(sales_2023)
+    sales_with_states = loader.get_customer_geographic_data(sales_2023)
+    
+    # Delivery metrics are derived row by row from each order's own dates, so
+    # they can be attached to the review rows directly instead of joining
+    sales_with_delivery_and_reviews = loader.add_delivery_metrics(sales_with_reviews)
+    
+    data = {
+        'sales_2023': sales_2023,
+        'sales_with_delivery': sales_with_delivery,
+        'order_reviews': loader.get_order_reviews(sales_2023),
+        'sales_with_delivery_and_reviews': sales_with_delivery_and_reviews,
+        # Rollups: monthly trends are summed from daily totals per date
+        # range; the category and state datasets carry no purchase date, so
+        # their performance tables are computed once
+        'daily_sales_2023': metrics.calculate_daily_sales(sales_2023),
+        'category_performance': metrics.calculate_product_performance(sales_with_categories),
+        'state_performance': metrics.calculate_geographic_performance(sales_with_states),
+        # The 2022 comparison does not depend on the selected date range;
+        # its revenue totals are stored as a single row
+        'monthly_2022': metrics.calculate_monthly_trends(sales_2022),
+        'revenue_2022': pd.DataFrame([metrics.calculate_revenue_metrics(sales_2022)])
+    }
+    
+    for key, df in data.items():
+        # Sort once so date filtering can slice instead of masking
+        if 'order_purchase_timestamp' in df.columns:
+            df['order_purchase_timestamp'] = pd.to_datetime(df['order_purchase_timestamp'], format='ISO8601')
+            df = df.sort_values('order_purchase_timestamp', kind='stable', ignore_index=True)
+        
+        data[key] = df
+    
+    return data
+
+# Cached as a shared resource: st.cache_data would deserialize a copy of
+# every frame on each call. The frames are never modified after loading
+@st.cache_resource
 def load_data():
-    """Load and cache the e-commerce data"""
+    """Load and cache the e-commerce data, reusing the on-disk cache when fresh"""
     try:
-        loader = EcommerceDataLoader("ecommerce_data")
-        datasets = loader.load_all_datasets()
+        cache_path = _feather_cache_path()
+        if os.path.isdir(cache_path):
+            return _read_feather_cache(cache_path)
         
-        # Create enhanced datasets
-        sales_2023 = loader.create_sales_dataset(target_year=2023, order_status='delivered')
-        sales_2022 = loader.create_sales_dataset(target_year=2022, order_status='delivered')
-        
-        sales_with_delivery = loader.add_delivery_metrics(sales_2023)
-        sales_with_reviews = loader.get_review_data(sales_2023)
-        sales_with_categories = loader.get_product_categories_data(sales_2023)
-        sales_with_states = loader.get_customer_geographic_data(sales_2023)
-        
-        return {
-            'sales_2023': sales_2023,
-            'sales_2022': sales_2022,
-            'sales_with_delivery': sales_with_delivery,
-            'sales_with_reviews': sales_with_reviews,
-            'sales_with_categories': sales_with_categories,
-            'sales_with_states': sales_with_states
-        }
+        data = _build_datasets()
+        try:
+            _write_feather_cache(data, cache_path)
+        except OSError as e:
+            print(f"Warning: could not write data cache: {e}")
+        return data
     except Exception as e:
         st.error(f"Error loading data: {e}")
         return None
 
 def filter_data_by_date(data_dict, start_date, end_date):
     """Filter all datasets by date range"""
+    start = pd.to_datetime(start_date).to_datetime64()
+    end = pd.to_datetime(end_date).to_datetime64()
     filtered_data = {}
     
     for key, df in data_dict.items():
         if 'order_purchase_timestamp' in df.columns:
-            # Convert timestamp to datetime if it's not already
-            if not pd.api.types.is_datetime64_any_dtype(df['order_purchase_timestamp']):
-                df['order_purchase_timestamp'] = pd.to_datetime(df['order_purchase_timestamp'])
-            
-            # Filter by date range
-            mask = (df['order_purchase_timestamp'] >= pd.to_datetime(start_date)) & \
-                   (df['order_purchase_timestamp'] <= pd.to_datetime(end_date))
-            filtered_data[key] = df[mask].copy()
+            # Datasets are parsed and sorted by purchase time in load_data(), so the
+            # date range is a contiguous slice; metrics only read from it
+            timestamps = df['order_purchase_timestamp'].to_numpy()
+            lo = np.searchsorted(timestamps, start, side='left')
+            hi = np.searchsorted(timestamps, end, side='right')
+            filtered_data[key] = df.iloc[lo:hi]
         else:
-            filtered_data[key] = df.copy()
+            filtered_data[key] = df
     
     return filtered_data
 
+def _filtered_data(start_date, end_date):
+    """Return the cached datasets restricted to a date range"""
+    return filter_data_by_date(load_data(), start_date, end_date)
+
+# Metric results are cached per date range so revisiting a range is instant
+@st.cache_data(show_spinner=False, max_entries=MAX_CACHED_RANGES)
+def _revenue_metrics(start_date, end_date):
+    return metrics.calculate_revenue_metrics(
+        _filtered_data(start_date, end_date)['sales_2023'],
+        comparison_metrics=load_data()['revenue_2022'].to_dict('records')[0]
+    )
+
+@st.cache_data(show_spinner=False, max_entries=MAX_CACHED_RANGES)
+def _monthly_trends(start_date, end_date):
+    daily_sales = load_data()['daily_sales_2023']
+    
+    # filter_data_by_date keeps purchases up to midnight at the start of
+    # end_date, i.e. the whole days in [start_date, end_date)
+    dates = daily_sales['date'].to_numpy()
+    lo = np.searchsorted(dates, pd.to_datetime(start_date).to_datetime64(), side='left')
+    hi = np.searchsorted(dates, pd.to_datetime(end_date).to_datetime64(), side='left')
+    
+    return metrics.calculate_monthly_trends_from_daily(daily_sales.iloc[lo:hi])
+
+@st.cache_data(show_spinner=False, max_entries=MAX_CACHED_RANGES)
+def _delivery_performance(start_date, end_date):
+    return metrics.calculate_delivery_performance(
+        _filtered_data(start_date, end_date)['sales_with_delivery']
+    )
+
+@st.cache_data(show_spinner=False, max_entries=MAX_CACHED_RANGES)
+def _customer_satisfaction(start_date, end_date):
+    return metrics.calculate_customer_satisfaction(
+        _filtered_data(start_date, end_date)['order_reviews'],
+        deduplicate=False
+    )
+
+@st.cache_data(show_spinner=False, max_entries=MAX_CACHED_RANGES)
+def _satisfaction_vs_delivery(start_date, end_date):
+    return metrics.analyze_satisfaction_vs_delivery(
+        _filtered_data(start_date, end_date)['sales_with_delivery_and_reviews']
+    )
+
 def format_currency(value):
     """Format currency values for display"""
     if value >= 1_000_000:
@@ -175,6 +231,17 @@ def format_currency(value):
     else:
         return f"${value:.0f}"
 
+def format_currency_labels(values):
+    """Format an array of currency values for display, matching format_currency"""
+    values = np.asarray(values, dtype=float)
+    return np.where(
+        values >= 1_000_000, np.char.mod('$%.1fM', values / 1_000_000),
+        np.where(
+            values >= 1_000, np.char.mod('$%.0fK', values / 1_000),
+            np.char.mod('$%.0f', values)
+        )
+    )
+
 def create_kpi_card(title, value, trend_value, is_currency=True):
     """Create a KPI card with trend indicator"""
     if is_currency:
@@ -193,14 +260,55 @@ def create_kpi_card(title, value, trend_value, is_currency=True):
     </div>
     """
 
+def create_card_row(cards):
+    """Lay out HTML cards side by side in a single flex row"""
+    # Joined onto one line so neither blank nor indented lines can end the
+    # markdown HTML block or turn part of it into a code block
+    card_html = ''.join(line.strip() for card in cards for line in card.splitlines())
+    return f'<div class="card-row">{card_html}</div>'
+
+def downsample_m4(x, y, max_points=MAX_TREND_POINTS):
+    """Reduce a series to at most max_points with M4 (first/last/min/max) buckets"""
+    if len(y) <= max_points:
+        return x, y
+    
+    x = np.asarray(x)
+    y = np.asarray(y, dtype=float)
+    bucket_size = -(-y.size // (max_points // 4))
+    n_buckets = -(-y.size // bucket_size)
+    
+    # Pad the last bucket so every bucket is a row of equal width
+    buckets = np.full(n_buckets * bucket_size, np.nan)
+    buckets[:y.size] = y
+    buckets = buckets.reshape(n_buckets, bucket_size)
+    
+    firsts = np.arange(n_buckets) * bucket_size
+    lasts = np.minimum(firsts + bucket_size, y.size) - 1
+    lows = firsts + np.argmin(np.where(np.isnan(buckets), np.inf, buckets), axis=1)
+    highs = firsts + np.argmax(np.where(np.isnan(buckets), -np.inf, buckets), axis=1)
+    
+    keep = np.unique(np.concatenate([firsts, lasts, lows, highs]))
+    keep = keep[keep < y.size]
+    return x[keep], y[keep]
+
+def _frame_digest(df):
+    """Content hash used to key cached figures on their (small) input frames"""
+    return (tuple(df.columns), pd.util.hash_pandas_object(df, index=True).values.tobytes())
+
+# Figures are rebuilt only when the aggregated data they plot changes
+cache_figure = st.cache_resource(hash_funcs={pd.DataFrame: _frame_digest}, show_spinner=False,
+                                 max_entries=MAX_CACHED_RANGES)
+
+@cache_figure
 def create_revenue_trend_chart(monthly_data, comparison_data=None):
     """Create revenue trend line chart with current and previous period"""
     fig = go.Figure()
     
-    # Current period line
+    # Current period line; long (daily or finer) series are downsampled
+    x, y = downsample_m4(monthly_data['month'], monthly_data['revenue'])
     fig.add_trace(go.Scatter(
-        x=monthly_data['month'],
-        y=monthly_data['revenue'],
+        x=x,
+        y=y,
         mode='lines+markers',
         name='2023',
         line=dict(color='#1f77b4', width=3),
@@ -209,9 +317,10 @@ def create_revenue_trend_chart(monthly_data, comparison_data=None):
     
     # Previous period line (dashed)
     if comparison_data is not None:
+        x, y = downsample_m4(comparison_data['month'], comparison_data['revenue'])
         fig.add_trace(go.Scatter(
-            x=comparison_data['month'],
-            y=comparison_data['revenue'],
+            x=x,
+            y=y,
             mode='lines+markers',
             name='2022',
             line=dict(color='#ff7f0e', width=2, dash='dash'),
@@ -236,20 +345,18 @@ def create_revenue_trend_chart(monthly_data, comparison_data=None):
     
     return fig
 
+@cache_figure
 def create_category_bar_chart(category_data):
     """Create top 10 categories bar chart with blue gradient"""
     top_10 = category_data.head(10)
     
-    # Create blue gradient colors
-    colors = [f'rgba(31, 119, 180, {0.3 + 0.7 * (i / 9)})' for i in range(len(top_10))]
-    
     fig = go.Figure(data=[
         go.Bar(
             x=top_10['total_revenue'],
             y=top_10['product_category_name'],
             orientation='h',
-            marker_color=colors,
-            text=[format_currency(x) for x in top_10['total_revenue']],
+            marker_color=list(BLUE_GRADIENT[:len(top_10)]),
+            text=format_currency_labels(top_10['total_revenue']),
             textposition='outside'
         )
     ])
@@ -267,23 +374,24 @@ def create_category_bar_chart(category_data):
     
     return fig
 
+@cache_figure
 def create_us_choropleth_map(state_data):
     """Create US choropleth map for revenue by state"""
-    fig = px.choropleth(
-        state_data,
-        locations='state',
-        color='total_revenue',
+    fig = go.Figure(go.Choropleth(
+        locations=state_data['state'].to_numpy(),
+        z=state_data['total_revenue'].to_numpy(),
         locationmode='USA-states',
-        scope='usa',
-        title='Revenue by State',
-        color_continuous_scale='Blues',
-        labels={'total_revenue': 'Revenue'}
-    )
+        colorscale='Blues',
+        colorbar_title='Revenue',
+        hovertemplate='state=%{location}<br>Revenue=%{z}<extra></extra>'
+    ))
     
     fig.update_layout(
+        title='Revenue by State',
         margin=dict(l=0, r=0, t=40, b=0),
         height=350,
         geo=dict(
+            scope='usa',
             showframe=False,
             showcoastlines=True,
             projection_type='albers usa'
@@ -292,6 +400,7 @@ def create_us_choropleth_map(state_data):
     
     return fig
 
+@cache_figure
 def create_delivery_satisfaction_chart(delivery_satisfaction):
     """Create delivery time vs satisfaction bar chart"""
     # Order categories properly
@@ -341,136 +450,126 @@ def main():
         st.error("Failed to load data. Please check your data files.")
         return
     
-    # Filter data by date range
-    filtered_data = filter_data_by_date(data_dict, start_date, end_date)
-    
-    # Initialize metrics calculator
-    metrics = EcommerceMetrics()
-    
+    _dashboard_body(data_dict, start_date, end_date)
+
+# The date range is the only input to the data; interactions inside the
+# fragment rerun just the KPIs and charts, not the header and stylesheet
+@st.fragment
+def _dashboard_body(data_dict, start_date, end_date):
+    """Render the KPI cards, chart grid and customer experience cards"""
     # Calculate current period metrics
-    current_metrics = metrics.calculate_revenue_metrics(
-        filtered_data['sales_2023'], 
-        data_dict['sales_2022']
-    )
-    
-    monthly_trends = metrics.calculate_monthly_trends(filtered_data['sales_2023'])
-    category_performance = metrics.calculate_product_performance(filtered_data['sales_with_categories'])
-    state_performance = metrics.calculate_geographic_performance(filtered_data['sales_with_states'])
-    delivery_metrics = metrics.calculate_delivery_performance(filtered_data['sales_with_delivery'])
-    satisfaction_metrics = metrics.calculate_customer_satisfaction(filtered_data['sales_with_reviews'])
-    
-    # Combine delivery and review data for analysis
-    combined_data = filtered_data['sales_with_delivery'].merge(
-        filtered_data['sales_with_reviews'][['order_id', 'review_score']], 
-        on='order_id', how='inner'
-    )
-    delivery_satisfaction = metrics.analyze_satisfaction_vs_delivery(combined_data)
+    current_metrics = _revenue_metrics(start_date, end_date)
+    monthly_trends = _monthly_trends(start_date, end_date)
+    category_performance = data_dict['category_performance']
+    state_performance = data_dict['state_performance']
+    delivery_metrics = _delivery_performance(start_date, end_date)
+    satisfaction_metrics = _customer_satisfaction(start_date, end_date)
+    delivery_satisfaction = _satisfaction_vs_delivery(start_date, end_date)
     
     # KPI Row
     st.subheader("Key Performance Indicators")
-    kpi_col1, kpi_col2, kpi_col3, kpi_col4 = st.columns(4)
     
-    with kpi_col1:
-        st.markdown(create_kpi_card(
+    # Calculate monthly growth from trends
+    avg_monthly_growth = monthly_trends['revenue_growth'].mean() if not monthly_trends['revenue_growth'].isna().all() else 0
+    
+    # All four cards go out as one element
+    st.markdown(create_card_row([
+        create_kpi_card(
             "Total Revenue",
             current_metrics['total_revenue'],
             current_metrics.get('revenue_growth_rate', 0)
-        ), unsafe_allow_html=True)
-    
-    with kpi_col2:
-        # Calculate monthly growth from trends
-        avg_monthly_growth = monthly_trends['revenue_growth'].mean() if not monthly_trends['revenue_growth'].isna().all() else 0
-        st.markdown(create_kpi_card(
+        ),
+        create_kpi_card(
             "Monthly Growth",
             avg_monthly_growth,
             avg_monthly_growth,
             is_currency=False
-        ), unsafe_allow_html=True)
-    
-    with kpi_col3:
-        st.markdown(create_kpi_card(
+        ),
+        create_kpi_card(
             "Average Order Value",
             current_metrics['average_order_value'],
             current_metrics.get('aov_growth_rate', 0)
-        ), unsafe_allow_html=True)
-    
-    with kpi_col4:
-        st.markdown(create_kpi_card(
+        ),
+        create_kpi_card(
             "Total Orders",
             current_metrics['total_orders'],
             current_metrics.get('order_growth_rate', 0),
             is_currency=False
-        ), unsafe_allow_html=True)
+        )
+    ]), unsafe_allow_html=True)
     
     st.markdown("<br>", unsafe_allow_html=True)
     
     # Charts Grid (2x2)
     st.subheader("Performance Analytics")
+    
+    # Build the figures concurrently; st.plotly_chart stays on the script thread
+    with ThreadPoolExecutor(max_workers=4, initializer=add_script_run_ctx,
+                            initargs=(None, get_script_run_ctx())) as executor:
+        revenue_future = executor.submit(create_revenue_trend_chart, monthly_trends, data_dict['monthly_2022'])
+        category_future = executor.submit(create_category_bar_chart, category_performance)
+        map_future = executor.submit(create_us_choropleth_map, state_performance)
+        delivery_future = executor.submit(create_delivery_satisfaction_chart, delivery_satisfaction)
+    
     chart_row1_col1, chart_row1_col2 = st.columns(2)
     
     with chart_row1_col1:
         # Revenue trend chart
-        monthly_2022 = metrics.calculate_monthly_trends(data_dict['sales_2022'])
-        revenue_chart = create_revenue_trend_chart(monthly_trends, monthly_2022)
-        st.plotly_chart(revenue_chart, use_container_width=True)
+        st.plotly_chart(revenue_future.result(), use_container_width=True)
     
     with chart_row1_col2:
         # Top 10 categories bar chart
-        category_chart = create_category_bar_chart(category_performance)
-        st.plotly_chart(category_chart, use_container_width=True)
+        st.plotly_chart(category_future.result(), use_container_width=True)
     
     chart_row2_col1, chart_row2_col2 = st.columns(2)
     
     with chart_row2_col1:
         # US choropleth map
-        us_map = create_us_choropleth_map(state_performance)
-        st.plotly_chart(us_map, use_container_width=True)
+        st.plotly_chart(map_future.result(), use_container_width=True)
     
     with chart_row2_col2:
         # Delivery satisfaction chart
-        delivery_chart = create_delivery_satisfaction_chart(delivery_satisfaction)
-        st.plotly_chart(delivery_chart, use_container_width=True)
+        st.plotly_chart(delivery_future.result(), use_container_width=True)
     
     st.markdown("<br>", unsafe_allow_html=True)
     
     # Bottom Row (2 cards)
     st.subheader("Customer Experience")
-    bottom_col1, bottom_col2 = st.columns(2)
-    
-    with bottom_col1:
-        # Average delivery time card
-        delivery_trend = 0  # Calculate trend if comparison data available
-        avg_delivery = delivery_metrics['average_delivery_days']
-        trend_color = "trend-positive" if delivery_trend <= 0 else "trend-negative"
-        trend_arrow = "↗" if delivery_trend >= 0 else "↘"
-        
-        st.markdown(f"""
-        <div class="bottom-card">
-            <div class="large-number">{avg_delivery:.1f} days</div>
-            <div class="kpi-label">Average Delivery Time</div>
-            <div class="{trend_color}">{trend_arrow} {abs(delivery_trend):.2f}%</div>
-        </div>
-        """, unsafe_allow_html=True)
-    
-    with bottom_col2:
-        # Review score card
-        avg_rating = satisfaction_metrics['average_rating']
-        full_stars = int(avg_rating)
-        half_star = 1 if avg_rating - full_stars >= 0.5 else 0
-        empty_stars = 5 - full_stars - half_star
-        
-        stars_html = "★" * full_stars
-        if half_star:
-            stars_html += "☆"
-        stars_html += "☆" * empty_stars
-        
-        st.markdown(f"""
-        <div class="bottom-card">
-            <div class="large-number">{avg_rating:.1f}</div>
-            <div class="review-stars">{stars_html}</div>
-            <div class="subtitle">Average Review Score</div>
-        </div>
-        """, unsafe_allow_html=True)
+    
+    # Average delivery time card
+    delivery_trend = 0  # Calculate trend if comparison data available
+    avg_delivery = delivery_metrics['average_delivery_days']
+    trend_color = "trend-positive" if delivery_trend <= 0 else "trend-negative"
+    trend_arrow = "↗" if delivery_trend >= 0 else "↘"
+    
+    delivery_card = f"""
+    <div class="bottom-card">
+        <div class="large-number">{avg_delivery:.1f} days</div>
+        <div class="kpi-label">Average Delivery Time</div>
+        <div class="{trend_color}">{trend_arrow} {abs(delivery_trend):.2f}%</div>
+    </div>
+    """
+    
+    # Review score card
+    avg_rating = satisfaction_metrics['average_rating']
+    full_stars = int(avg_rating)
+    half_star = 1 if avg_rating - full_stars >= 0.5 else 0
+    empty_stars = 5 - full_stars - half_star
+    
+    stars_html = "★" * full_stars
+    if half_star:
+        stars_html += "☆"
+    stars_html += "☆" * empty_stars
+    
+    review_card = f"""
+    <div class="bottom-card">
+        <div class="large-number">{avg_rating:.1f}</div>
+        <div class="review-stars">{stars_html}</div>
+        <div class="subtitle">Average Review Score</div>
+    </div>
+    """
+    
+    st.markdown(create_card_row([delivery_card, review_card]), unsafe_allow_html=True)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
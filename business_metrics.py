@@ -7,6 +7,7 @@ growth rates, customer satisfaction, and operational performance indicators.
 
 import pandas as pd
 import numpy as np
+import pyarrow as pa
 from typing import Dict, List, Tuple, Optional
 import matplotlib.pyplot as plt
 import plotly.express as px
@@ -33,33 +34,51 @@ class EcommerceMetrics:
             'info': '#17a2b8',
             'neutral': '#6c757d'
         }
+        # Shared layout for the plot_* figures, built once so the template
+        # is resolved here rather than on every plot
+        self._base_layout = go.Layout(template='plotly_white')
     
     def calculate_revenue_metrics(self, sales_data: pd.DataFrame, 
-                                comparison_data: pd.DataFrame = None) -> Dict:
+                                comparison_data: pd.DataFrame = None,
+                                comparison_metrics: Optional[Dict] = None) -> Dict:
         """
         Calculate revenue-related metrics.
         
         Args:
             sales_data (pd.DataFrame): Current period sales data
             comparison_data (pd.DataFrame, optional): Previous period for comparison
+            comparison_metrics (Dict, optional): Previously calculated revenue metrics
+                for the comparison period, used instead of comparison_data
             
         Returns:
             Dict: Revenue metrics including total revenue, growth rate, etc.
         """
         metrics = {}
         
-        # Current period metrics
-        metrics['total_revenue'] = sales_data['price'].sum()
-        metrics['total_orders'] = sales_data['order_id'].nunique()
+        # Current period metrics; prices are accumulated in float64 whatever
+        # their storage dtype
+        prices = sales_data['price'].to_numpy(dtype=float)
+        
+        # Order totals from one hash pass over order_id; the number of totals
+        # is the number of unique orders
+        codes, _ = pd.factorize(sales_data['order_id'])
+        valid = codes >= 0
+        order_totals = np.bincount(codes[valid], weights=prices[valid])
+        
+        metrics['total_revenue'] = np.nansum(prices)
+        metrics['total_orders'] = order_totals.size
         metrics['total_items'] = len(sales_data)
-        metrics['average_order_value'] = sales_data.groupby('order_id')['price'].sum().mean()
-        metrics['average_item_price'] = sales_data['price'].mean()
+        metrics['average_order_value'] = order_totals.mean()
+        metrics['average_item_price'] = np.nanmean(prices)
         
-        # Comparison metrics if previous period data provided
         if comparison_data is not None:
-            prev_revenue = comparison_data['price'].sum()
-            prev_orders = comparison_data['order_id'].nunique()
-            prev_aov = comparison_data.groupby('order_id')['price'].sum().mean()
+            comparison_metrics = self.calculate_revenue_metrics(comparison_data)
+        
+        # Comparison metrics if previous period data provided
+        if comparison_metrics is not None:
+            prev_revenue = comparison_metrics['total_revenue']
+            prev_orders = comparison_metrics['total_orders']
+            prev_aov = comparison_metrics['average_order_value']
             
             metrics['revenue_growth_rate'] = ((metrics['total_revenue'] - prev_revenue) / prev_revenue) * 100
             metrics['order_growth_rate'] = ((metrics['total_orders'] - prev_orders) / prev_orders) * 100
@@ -81,14 +100,69 @@ class EcommerceMetrics:
         Returns:
             pd.DataFrame: Monthly metrics with growth rates
         """
-        monthly_metrics = sales_data.groupby('month').agg({
+        monthly_metrics = sales_data.groupby('month', observed=True).agg({
             'price': 'sum',
             'order_id': 'nunique'
         }).reset_index()
         
         monthly_metrics.columns = ['month', 'revenue', 'orders']
-        monthly_metrics['aov'] = sales_data.groupby('month')['price'].sum() / sales_data.groupby('month')['order_id'].nunique()
+        monthly_metrics['aov'] = monthly_metrics['revenue'] / monthly_metrics['orders']
+        
+        return self._add_monthly_growth(monthly_metrics)
+    
+    def calculate_daily_sales(self, sales_data: pd.DataFrame) -> pd.DataFrame:
+        """
+        Aggregate sales data to one row per purchase day.
+        
+        Every order falls on a single day, so daily revenue and order counts
+        can be summed into monthly trends for any date range without
+        rescanning the item-level data.
         
+        Args:
+            sales_data (pd.DataFrame): Sales data with purchase timestamps
+            
+        Returns:
+            pd.DataFrame: Daily revenue and order counts with month column
+        """
+        daily_sales = self._group_aggregate(
+            sales_data.assign(date=sales_data['order_purchase_timestamp'].dt.normalize()),
+            ['date'],
+            {'revenue': ('price', 'sum'), 'orders': ('order_id', 'count_distinct')}
+        )
+        
+        daily_sales['month'] = daily_sales['date'].dt.month
+        
+        return daily_sales
+    
+    def calculate_monthly_trends_from_daily(self, daily_sales: pd.DataFrame) -> pd.DataFrame:
+        """
+        Calculate monthly revenue trends from pre-aggregated daily sales.
+        
+        Args:
+            daily_sales (pd.DataFrame): Output of calculate_daily_sales()
+            
+        Returns:
+            pd.DataFrame: Monthly metrics with growth rates
+        """
+        monthly_metrics = daily_sales.groupby('month', observed=True).agg({
+            'revenue': 'sum',
+            'orders': 'sum'
+        }).reset_index()
+        
+        monthly_metrics['aov'] = monthly_metrics['revenue'] / monthly_metrics['orders']
+        
+        return self._add_monthly_growth(monthly_metrics)
+    
+    def _add_monthly_growth(self, monthly_metrics: pd.DataFrame) -> pd.DataFrame:
+        """
+        Add month-over-month growth rates to monthly metrics.
+        
+        Args:
+            monthly_metrics (pd.DataFrame): Monthly revenue, orders and aov
+            
+        Returns:
+            pd.DataFrame: Monthly metrics with growth rates
+        """
         # Calculate month-over-month growth rates
         monthly_metrics['revenue_growth'] = monthly_metrics['revenue'].pct_change() * 100
         monthly_metrics['order_growth'] = monthly_metrics['orders'].pct_change() * 100
@@ -106,21 +180,19 @@ class EcommerceMetrics:
         Returns:
             pd.DataFrame: Product category performance metrics
         """
-        category_metrics = sales_with_categories.groupby('product_category_name').agg({
-            'price': ['sum', 'mean', 'count'],
-            'order_id': 'nunique'
-        }).round(2)
-        
-        # Flatten column names
-        category_metrics.columns = ['total_revenue', 'avg_price', 'total_items', 'unique_orders']
-        category_metrics = category_metrics.reset_index()
+        category_metrics = self._group_aggregate(sales_with_categories, ['product_category_name'], {
+            'total_revenue': ('price', 'sum'),
+            'avg_price': ('price', 'mean'),
+            'total_items': ('price', 'count'),
+            'unique_orders': ('order_id', 'count_distinct')
+        })
         
         # Calculate additional metrics
         category_metrics['revenue_share'] = (category_metrics['total_revenue'] / 
-                                           category_metrics['total_revenue'].sum() * 100).round(2)
+                                           category_metrics['total_revenue'].sum() * 100)
         
         category_metrics['items_per_order'] = (category_metrics['total_items'] / 
-                                             category_metrics['unique_orders']).round(2)
+                                             category_metrics['unique_orders'])
         
         return category_metrics.sort_values('total_revenue', ascending=False)
     
@@ -134,45 +206,117 @@ class EcommerceMetrics:
         Returns:
             pd.DataFrame: Geographic performance metrics
         """
-        state_metrics = sales_with_states.groupby('customer_state').agg({
-            'price': 'sum',
-            'order_id': 'nunique',
-            'customer_id': 'nunique'
-        }).reset_index()
-        
-        state_metrics.columns = ['state', 'total_revenue', 'total_orders', 'unique_customers']
+        state_metrics = self._group_aggregate(sales_with_states, ['customer_state'], {
+            'total_revenue': ('price', 'sum'),
+            'total_orders': ('order_id', 'count_distinct')
+        }).rename(columns={'customer_state': 'state'})
+        
+        # Each customer lives in one state, so distinct customers per state
+        # is a count of the states of the distinct customers: scatter every
+        # row's state onto its customer code, then count per state
+        customer_codes, customers = pd.factorize(sales_with_states['customer_id'])
+        state_codes, states = pd.factorize(sales_with_states['customer_state'])
+        valid = (customer_codes >= 0) & (state_codes >= 0)
+        customer_state = np.full(len(customers), -1)
+        customer_state[customer_codes[valid]] = state_codes[valid]
+        customers_per_state = pd.Series(
+            np.bincount(customer_state[customer_state >= 0], minlength=len(states)),
+            index=np.asarray(states)
+        )
+        state_metrics['unique_customers'] = customers_per_state.reindex(
+            state_metrics['state'].to_numpy()
+        ).to_numpy()
         
         # Calculate additional metrics
         state_metrics['revenue_per_customer'] = (state_metrics['total_revenue'] / 
-                                               state_metrics['unique_customers']).round(2)
+                                               state_metrics['unique_customers'])
         
         state_metrics['orders_per_customer'] = (state_metrics['total_orders'] / 
-                                              state_metrics['unique_customers']).round(2)
+                                              state_metrics['unique_customers'])
         
         state_metrics['revenue_share'] = (state_metrics['total_revenue'] / 
-                                        state_metrics['total_revenue'].sum() * 100).round(2)
+                                        state_metrics['total_revenue'].sum() * 100)
         
         return state_metrics.sort_values('total_revenue', ascending=False)
     
-    def calculate_customer_satisfaction(self, sales_with_reviews: pd.DataFrame) -> Dict:
+    def _group_aggregate(self, data: pd.DataFrame, keys: List[str],
+                         aggregations: Dict[str, Tuple[str, str]]) -> pd.DataFrame:
+        """
+        Group rows by key columns using Arrow's multi-threaded hash aggregation.
+        
+        Only the key and aggregated columns are converted to Arrow, and the
+        small result is returned as pandas. Rows with missing keys are dropped
+        and groups are sorted by key, matching a pandas groupby.
+        
+        Args:
+            data (pd.DataFrame): Rows to aggregate
+            keys (List[str]): Columns to group by
+            aggregations (Dict[str, Tuple[str, str]]): Output column name mapped to
+                (input column, Arrow aggregate function), e.g. ('order_id', 'count_distinct')
+            
+        Returns:
+            pd.DataFrame: Key columns followed by one column per aggregation
+        """
+        columns = list(dict.fromkeys(keys + [column for column, _ in aggregations.values()]))
+        data = data[columns].dropna(subset=keys)
+        
+        # Categorical values (e.g. encoded IDs) are aggregated by their codes,
+        # with missing values as NaN
+        for column in columns:
+            if column not in keys and isinstance(data[column].dtype, pd.CategoricalDtype):
+                data[column] = data[column].cat.codes.where(data[column].notna())
+        
+        table = pa.Table.from_pandas(data, preserve_index=False)
+        grouped = table.group_by(keys).aggregate(list(dict.fromkeys(aggregations.values())))
+        
+        result = pd.DataFrame({key: grouped[key].to_pandas() for key in keys})
+        for name, (column, function) in aggregations.items():
+            result[name] = grouped[f'{column}_{function}'].to_pandas()
+        
+        return result.sort_values(keys, ignore_index=True)
+    
+    def calculate_customer_satisfaction(self, sales_with_reviews: pd.DataFrame,
+                                        deduplicate: bool = True) -> Dict:
         """
         Calculate customer satisfaction metrics based on review scores.
         
         Args:
             sales_with_reviews (pd.DataFrame): Sales data with review scores
+            deduplicate (bool): Reduce item-level rows to unique order reviews first;
+                pass False for data that already has one row per order review,
+                such as EcommerceDataLoader.get_order_reviews()
             
         Returns:
             Dict: Customer satisfaction metrics
         """
-        # Remove duplicates to get unique orders
-        unique_orders = sales_with_reviews[['order_id', 'review_score']].drop_duplicates()
+        unique_orders = sales_with_reviews[['order_id', 'review_score']]
+        if deduplicate:
+            # Remove duplicates to get unique orders
+            unique_orders = unique_orders.drop_duplicates()
+        
+        review_scores = unique_orders['review_score']
+        # NaN compares False below, so missing scores stay in the denominators
+        # but never count as satisfied, promoters or detractors
+        scores = review_scores.to_numpy(dtype=float)
+        
+        if pd.api.types.is_integer_dtype(review_scores):
+            score_counts = np.bincount(review_scores.to_numpy(dtype=np.int64))
+            observed_scores = np.flatnonzero(score_counts)
+            rating_distribution = pd.Series(
+                score_counts[observed_scores],
+                index=pd.Index(observed_scores, name='review_score'),
+                name='count'
+            )
+        else:
+            # Float scores may carry NaN (e.g. after a left join); value_counts skips them
+            rating_distribution = review_scores.value_counts().sort_index()
         
         metrics = {
-            'average_rating': unique_orders['review_score'].mean(),
-            'total_reviews': len(unique_orders),
-            'rating_distribution': unique_orders['review_score'].value_counts().sort_index(),
-            'satisfaction_rate': (unique_orders['review_score'] >= 4).mean() * 100,  # 4-5 stars
-            'nps_score': self._calculate_nps(unique_orders['review_score'])
+            'average_rating': np.nanmean(scores) if len(scores) else np.nan,
+            'total_reviews': len(scores),
+            'rating_distribution': rating_distribution,
+            'satisfaction_rate': (scores >= 4).mean() * 100,  # 4-5 stars
+            'nps_score': self._calculate_nps(scores)
         }
         
         return metrics
@@ -190,12 +334,23 @@ class EcommerceMetrics:
         # Remove duplicates to get unique orders
         unique_orders = sales_with_delivery[['order_id', 'delivery_speed', 'delivery_category']].drop_duplicates()
         
+        # Sort once for the median; undelivered orders (NaN) sort last, and
+        # the rate thresholds become binary searches in the delivered prefix
+        days = np.sort(unique_orders['delivery_speed'].to_numpy(dtype=float))
+        delivered = days[:np.count_nonzero(~np.isnan(days))]
+        fast_count = np.searchsorted(delivered, 3, side='right')
+        slow_count = delivered.size - np.searchsorted(delivered, 7, side='right')
+        
+        # A categorical value_counts also lists unused categories; keep only
+        # categories that occur, as for a plain string column
+        delivery_counts = unique_orders['delivery_category'].value_counts()
+        
         metrics = {
-            'average_delivery_days': unique_orders['delivery_speed'].mean(),
-            'median_delivery_days': unique_orders['delivery_speed'].median(),
-            'delivery_distribution': unique_orders['delivery_category'].value_counts(),
-            'fast_delivery_rate': (unique_orders['delivery_speed'] <= 3).mean() * 100,  # Within 3 days
-            'slow_delivery_rate': (unique_orders['delivery_speed'] > 7).mean() * 100   # More than 7 days
+            'average_delivery_days': delivered.mean(),
+            'median_delivery_days': np.median(delivered),
+            'delivery_distribution': delivery_counts[delivery_counts > 0],
+            'fast_delivery_rate': fast_count / days.size * 100,  # Within 3 days
+            'slow_delivery_rate': slow_count / days.size * 100   # More than 7 days
         }
         
         return metrics
@@ -215,25 +370,56 @@ class EcommerceMetrics:
             'order_id', 'delivery_speed', 'delivery_category', 'review_score'
         ]].drop_duplicates()
         
-        # Group by delivery category
-        satisfaction_by_delivery = unique_orders.groupby('delivery_category').agg({
-            'review_score': ['mean', 'count', 'std']
-        }).round(3)
+        # Group by delivery category using integer bucket codes
+        codes, categories = pd.factorize(unique_orders['delivery_category'], sort=True)
+        valid = codes >= 0
+        codes = codes[valid]
+        review_scores = unique_orders['review_score'].to_numpy(dtype=float)[valid]
+        avg_rating, review_count, rating_std = self._bucket_stats(
+            codes, review_scores, len(categories)
+        )
         
-        # Flatten column names
-        satisfaction_by_delivery.columns = ['avg_rating', 'review_count', 'rating_std']
-        satisfaction_by_delivery = satisfaction_by_delivery.reset_index()
+        # Satisfaction rate (4-5 stars) from the same bucket codes
+        satisfied_count = np.bincount(codes, weights=review_scores >= 4, minlength=len(categories))
         
-        # Calculate satisfaction rate (4-5 stars)
-        for category in unique_orders['delivery_category'].unique():
-            category_data = unique_orders[unique_orders['delivery_category'] == category]
-            satisfaction_rate = (category_data['review_score'] >= 4).mean() * 100
-            satisfaction_by_delivery.loc[
-                satisfaction_by_delivery['delivery_category'] == category, 'satisfaction_rate'
-            ] = satisfaction_rate
+        satisfaction_by_delivery = pd.DataFrame({
+            'delivery_category': categories,
+            'avg_rating': avg_rating.round(3),
+            'review_count': review_count,
+            'rating_std': rating_std.round(3),
+            'satisfaction_rate': satisfied_count / review_count * 100
+        })
         
         return satisfaction_by_delivery
     
+    def _bucket_stats(self, codes: np.ndarray, values: np.ndarray,
+                      n_buckets: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Calculate mean, count and sample standard deviation per bucket.
+        
+        For a handful of groups np.bincount over integer codes avoids the
+        hashing and index overhead of a pandas groupby.
+        
+        Args:
+            codes (np.ndarray): Bucket code (0 to n_buckets - 1) for each value
+            values (np.ndarray): Values to aggregate
+            n_buckets (int): Number of buckets
+            
+        Returns:
+            Tuple[np.ndarray, np.ndarray, np.ndarray]: Means, counts and standard deviations
+        """
+        counts = np.bincount(codes, minlength=n_buckets)
+        sums = np.bincount(codes, weights=values, minlength=n_buckets)
+        
+        with np.errstate(divide='ignore', invalid='ignore'):
+            means = sums / counts
+            # Two-pass variance keeps identical values at exactly zero
+            squared_deviations = np.bincount(codes, weights=(values - means[codes]) ** 2,
+                                             minlength=n_buckets)
+            stds = np.sqrt(squared_deviations / (counts - 1))
+        
+        return means, counts, stds
+    
     def _calculate_nps(self, scores: pd.Series) -> float:
         """
         Calculate Net Promoter Score (NPS) based on review scores.
@@ -245,12 +431,16 @@ class EcommerceMetrics:
         Returns:
             float: NPS score
         """
-        # Map 5-star scale to 10-point scale for NPS calculation
-        nps_scores = scores * 2  # 1->2, 2->4, 3->6, 4->8, 5->10
+        scores = np.asarray(scores)
+        
+        # On the 10-point scale (score * 2) promoters are 9-10 and detractors
+        # 0-6, i.e. 4.5-5 and 0-3 on the 5-star scale
+        promoters = np.count_nonzero(scores >= 4.5)
+        detractors = np.count_nonzero(scores <= 3)
+        total = scores.size
         
-        promoters = (nps_scores >= 9).sum()  # 9-10 (originally 4.5-5)
-        detractors = (nps_scores <= 6).sum()  # 0-6 (originally 0-3)
-        total = len(nps_scores)
+        if total == 0:
+            return 0.0
         
         nps = ((promoters - detractors) / total) * 100
         return round(nps, 2)
@@ -278,10 +468,10 @@ class EcommerceMetrics:
         ))
         
         fig.update_layout(
+            self._base_layout,
             title=f'Monthly Revenue Trend {title_suffix}',
             xaxis_title='Month',
             yaxis_title='Revenue ($)',
-            template='plotly_white',
             hovermode='x unified'
         )
         
@@ -304,16 +494,16 @@ class EcommerceMetrics:
                 x=category_data['product_category_name'],
                 y=category_data['total_revenue'],
                 marker_color=self.color_scheme['primary'],
-                text=category_data['revenue_share'].apply(lambda x: f'{x}%'),
+                text=np.char.mod('%.1f%%', category_data['revenue_share'].to_numpy(dtype=float)),
                 textposition='auto'
             )
         ])
         
         fig.update_layout(
+            self._base_layout,
             title=f'Revenue by Product Category {title_suffix}',
             xaxis_title='Product Category',
             yaxis_title='Total Revenue ($)',
-            template='plotly_white',
             xaxis_tickangle=-45
         )
         
@@ -379,8 +569,8 @@ class EcommerceMetrics:
         )
         
         fig.update_layout(
-            title='Customer Satisfaction Distribution',
-            template='plotly_white'
+            self._base_layout,
+            title='Customer Satisfaction Distribution'
         )
         
         fig.update_xaxes(title_text="Rating Score")
@@ -411,10 +601,10 @@ class EcommerceMetrics:
         ))
         
         fig.update_layout(
+            self._base_layout,
             title='Customer Satisfaction by Delivery Speed',
             xaxis_title='Delivery Time Category',
             yaxis_title='Average Rating (1-5)',
-            template='plotly_white',
             yaxis=dict(range=[0, 5])
         )
         
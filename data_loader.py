@@ -5,11 +5,28 @@ This module provides functions to load, clean, and prepare e-commerce datasets
 for analysis. It handles data type conversions, filtering, and basic transformations.
 """
 
+import numpy as np
 import pandas as pd
 from typing import Dict
 import warnings
 warnings.filterwarnings('ignore')
 
+# Derived frames share memory with their source until a column is written,
+# so selections and new columns never copy whole tables
+pd.set_option('mode.copy_on_write', True)
+
+# ID columns shared between datasets and used as merge keys
+ID_COLUMNS = ['order_id', 'customer_id', 'product_id']
+
+# Timestamp columns of the orders dataset
+ORDER_DATE_COLUMNS = [
+    'order_purchase_timestamp',
+    'order_approved_at', 
+    'order_delivered_carrier_date',
+    'order_delivered_customer_date',
+    'order_estimated_delivery_date'
+]
+
 
 class EcommerceDataLoader:
     """
@@ -28,6 +45,11 @@ class EcommerceDataLoader:
         """
         self.data_path = data_path
         self.datasets = {}
+        # Parsed orders and the raw orders frame they were built from
+        self._orders_prepared = None
+        self._orders_source = None
+        # Dataset summaries as (dataset, deep, info) keyed by dataset name
+        self._info_cache = {}
     
     def load_all_datasets(self) -> Dict[str, pd.DataFrame]:
         """
@@ -45,46 +67,85 @@ class EcommerceDataLoader:
             'payments': 'order_payments_dataset.csv'
         }
         
+        # Low-cardinality columns are parsed straight into categoricals and
+        # small integers into the narrowest type that holds them
+        column_dtypes = {
+            'orders': {'order_status': 'category'},
+            'order_items': {'order_item_id': 'int16'},
+            'products': {'product_category_name': 'category'},
+            'customers': {'customer_state': 'category'},
+            'reviews': {'review_score': 'int8'}
+        }
+        
         for name, filename in dataset_files.items():
             try:
                 file_path = f"{self.data_path}/{filename}"
-                self.datasets[name] = pd.read_csv(file_path)
+                # Arrow's multi-threaded CSV reader also parses the order
+                # timestamps natively
+                self.datasets[name] = pd.read_csv(
+                    file_path,
+                    engine='pyarrow',
+                    dtype=column_dtypes.get(name),
+                    parse_dates=ORDER_DATE_COLUMNS if name == 'orders' else None
+                )
                 print(f"Loaded {name}: {self.datasets[name].shape[0]} rows, {self.datasets[name].shape[1]} columns")
             except FileNotFoundError:
                 print(f"Warning: {filename} not found, skipping...")
                 continue
         
+        self._encode_ids()
+        
         return self.datasets
     
+    def _encode_ids(self) -> None:
+        """
+        Store each ID column as a categorical with the same categories in
+        every dataset, so merges on IDs compare integer codes instead of
+        hashing the 32-character ID strings.
+        """
+        for column in ID_COLUMNS:
+            names = [name for name, df in self.datasets.items() if column in df.columns]
+            ids = pd.concat([self.datasets[name][column] for name in names], ignore_index=True)
+            id_dtype = pd.CategoricalDtype(ids.dropna().unique())
+            
+            for name in names:
+                self.datasets[name][column] = self.datasets[name][column].astype(id_dtype)
+    
     def prepare_orders_data(self) -> pd.DataFrame:
         """
         Prepare orders data with proper date parsing and additional columns.
         
+        The result is built once and reused until the orders dataset is
+        replaced, so callers should not modify it in place.
+        
         Returns:
-            pd.DataFrame: Processed orders dataframe with date columns and year/month
+            pd.DataFrame: Processed orders dataframe with date columns, year/month
+                and year-month period_code
         """
         if 'orders' not in self.datasets:
             raise ValueError("Orders dataset not loaded. Call load_all_datasets() first.")
         
-        orders = self.datasets['orders'].copy()
+        if self._orders_source is self.datasets['orders']:
+            return self._orders_prepared
         
-        # Convert date columns to datetime
-        date_columns = [
-            'order_purchase_timestamp',
-            'order_approved_at', 
-            'order_delivered_carrier_date',
-            'order_delivered_customer_date',
-            'order_estimated_delivery_date'
-        ]
+        orders = self.datasets['orders'].copy(deep=False)
         
-        for col in date_columns:
-            if col in orders.columns:
-                orders[col] = pd.to_datetime(orders[col])
+        # Convert date columns to datetime unless the CSV reader already did.
+        # The CSVs use ISO 8601 timestamps; naming the format skips per-value inference
+        for col in ORDER_DATE_COLUMNS:
+            if col in orders.columns and not pd.api.types.is_datetime64_any_dtype(orders[col]):
+                orders[col] = pd.to_datetime(orders[col], format='ISO8601')
         
         # Add year and month columns for analysis
-        orders['year'] = orders['order_purchase_timestamp'].dt.year
-        orders['month'] = orders['order_purchase_timestamp'].dt.month
+        orders['year'] = orders['order_purchase_timestamp'].dt.year.astype('int16')
+        orders['month'] = orders['order_purchase_timestamp'].dt.month.astype('int8')
+        
+        # Year and month packed into one code so a year-month filter is a
+        # single comparison
+        orders['period_code'] = ((orders['year'] - 2000) * 12 + orders['month']).astype('int16')
         
+        self._orders_prepared = orders
+        self._orders_source = self.datasets['orders']
         return orders
     
     def create_sales_dataset(self, target_year: int = None, 
@@ -104,31 +165,33 @@ class EcommerceDataLoader:
         if 'orders' not in self.datasets or 'order_items' not in self.datasets:
             raise ValueError("Orders and order_items datasets required.")
         
-        # Prepare orders data
+        # Prepare orders data; order items are projected to the merged
+        # columns up front instead of copying the whole table
         orders = self.prepare_orders_data()
-        order_items = self.datasets['order_items'].copy()
+        order_items = self.datasets['order_items'][['order_id', 'order_item_id', 'product_id', 'price']]
+        
+        # Filter orders by status, year and month before merging so only
+        # matching orders are joined to their items
+        mask = pd.Series(True, index=orders.index)
+        if order_status:
+            mask &= orders['order_status'] == order_status
+        if target_year and target_month:
+            mask &= orders['period_code'] == (target_year - 2000) * 12 + target_month
+        elif target_year:
+            mask &= orders['year'] == target_year
+        elif target_month:
+            mask &= orders['month'] == target_month
         
         # Merge orders and order items
         sales_data = pd.merge(
-            left=order_items[['order_id', 'order_item_id', 'product_id', 'price']],
-            right=orders[['order_id', 'order_status', 'order_purchase_timestamp', 
-                         'order_delivered_customer_date', 'year', 'month']],
+            left=order_items,
+            right=orders.loc[mask, ['order_id', 'order_status', 'order_purchase_timestamp', 
+                                    'order_delivered_customer_date', 'year', 'month']],
             on='order_id',
-            how='inner'
+            how='inner',
+            sort=False
         )
         
-        # Filter by order status
-        if order_status:
-            sales_data = sales_data[sales_data['order_status'] == order_status].copy()
-        
-        # Filter by year
-        if target_year:
-            sales_data = sales_data[sales_data['year'] == target_year].copy()
-            
-        # Filter by month
-        if target_month:
-            sales_data = sales_data[sales_data['month'] == target_month].copy()
-        
         return sales_data
     
     def add_delivery_metrics(self, sales_data: pd.DataFrame) -> pd.DataFrame:
@@ -141,28 +204,20 @@ class EcommerceDataLoader:
         Returns:
             pd.DataFrame: Sales data with delivery speed metrics
         """
-        sales_with_delivery = sales_data.copy()
+        sales_with_delivery = sales_data.copy(deep=False)
         
-        # Calculate delivery speed in days
+        # Calculate delivery speed in days; float32 keeps NaN for undelivered orders
         sales_with_delivery['delivery_speed'] = (
             sales_with_delivery['order_delivered_customer_date'] - 
             sales_with_delivery['order_purchase_timestamp']
-        ).dt.days
-        
-        # Categorize delivery speed
-        def categorize_delivery_speed(days):
-            if pd.isna(days):
-                return 'Unknown'
-            elif days <= 3:
-                return '1-3 days'
-            elif days <= 7:
-                return '4-7 days'
-            else:
-                return '8+ days'
-        
-        sales_with_delivery['delivery_category'] = sales_with_delivery['delivery_speed'].apply(
-            categorize_delivery_speed
-        )
+        ).dt.days.astype('float32')
+        
+        # Categorize delivery speed: <=3, 4-7 and 8+ days, Unknown if not delivered
+        sales_with_delivery['delivery_category'] = pd.cut(
+            sales_with_delivery['delivery_speed'],
+            bins=[-np.inf, 3, 7, np.inf],
+            labels=['1-3 days', '4-7 days', '8+ days']
+        ).cat.add_categories('Unknown').fillna('Unknown')
         
         return sales_with_delivery
     
@@ -179,13 +234,14 @@ class EcommerceDataLoader:
         if 'products' not in self.datasets:
             raise ValueError("Products dataset required.")
         
-        products = self.datasets['products'][['product_id', 'product_category_name']].copy()
+        products = self.datasets['products'][['product_id', 'product_category_name']]
         
         return pd.merge(
             left=products,
             right=sales_data[['product_id', 'price', 'order_id']],
             on='product_id',
-            how='inner'
+            how='inner',
+            sort=False
         )
     
     def get_customer_geographic_data(self, sales_data: pd.DataFrame) -> pd.DataFrame:
@@ -202,22 +258,24 @@ class EcommerceDataLoader:
             raise ValueError("Orders and customers datasets required.")
         
         # Get orders with customer IDs
-        orders = self.datasets['orders'][['order_id', 'customer_id']].copy()
-        customers = self.datasets['customers'][['customer_id', 'customer_state']].copy()
+        orders = self.datasets['orders'][['order_id', 'customer_id']]
+        customers = self.datasets['customers'][['customer_id', 'customer_state']]
         
         # Merge sales data with customer info
         sales_with_customers = pd.merge(
             left=sales_data[['order_id', 'price']],
             right=orders,
             on='order_id',
-            how='inner'
+            how='inner',
+            sort=False
         )
         
         return pd.merge(
             left=sales_with_customers,
             right=customers,
             on='customer_id',
-            how='inner'
+            how='inner',
+            sort=False
         )
     
     def get_review_data(self, sales_data: pd.DataFrame) -> pd.DataFrame:
@@ -233,30 +291,67 @@ class EcommerceDataLoader:
         if 'reviews' not in self.datasets:
             raise ValueError("Reviews dataset required.")
         
-        reviews = self.datasets['reviews'][['order_id', 'review_score']].copy()
+        reviews = self.datasets['reviews'][['order_id', 'review_score']]
         
         return pd.merge(
             left=sales_data,
             right=reviews,
             on='order_id',
-            how='inner'
+            how='inner',
+            sort=False
         )
     
-    def get_dataset_info(self) -> Dict[str, Dict]:
+    def get_order_reviews(self, sales_data: pd.DataFrame) -> pd.DataFrame:
+        """
+        Get the review scores of the orders in a sales dataset, one row per
+        order and score rather than per order item.
+        
+        Args:
+            sales_data (pd.DataFrame): Sales dataset
+            
+        Returns:
+            pd.DataFrame: Order IDs and purchase timestamps with review scores
+        """
+        if 'reviews' not in self.datasets:
+            raise ValueError("Reviews dataset required.")
+        
+        reviews = self.datasets['reviews'][['order_id', 'review_score']].drop_duplicates()
+        orders = sales_data[['order_id', 'order_purchase_timestamp']].drop_duplicates('order_id')
+        
+        return pd.merge(
+            left=orders,
+            right=reviews,
+            on='order_id',
+            how='inner',
+            sort=False
+        )
+    
+    def get_dataset_info(self, deep: bool = False) -> Dict[str, Dict]:
         """
         Get summary information about all loaded datasets.
         
+        Summaries are cached per dataset and recomputed only when a dataset
+        is replaced or a different deep setting is requested.
+        
+        Args:
+            deep (bool): Measure the exact memory of string columns instead of
+                a fast estimate (default: False)
+        
         Returns:
             Dict[str, Dict]: Summary information for each dataset
         """
         info = {}
         for name, df in self.datasets.items():
-            info[name] = {
-                'rows': df.shape[0],
-                'columns': df.shape[1],
-                'missing_values': df.isnull().sum().sum(),
-                'memory_usage': df.memory_usage(deep=True).sum() / 1024**2  # MB
-            }
+            cached = self._info_cache.get(name)
+            if cached is None or cached[0] is not df or cached[1] != deep:
+                cached = (df, deep, {
+                    'rows': df.shape[0],
+                    'columns': df.shape[1],
+                    'missing_values': int(df.isna().sum().sum()),
+                    'memory_usage': df.memory_usage(deep=deep).sum() / 1024**2  # MB
+                })
+                self._info_cache[name] = cached
+            info[name] = cached[2]
         return info
 
 